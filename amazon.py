@@ -1,101 +1,42 @@
 import boto3
 import botocore.config
+import fitz
+import functools
+import hashlib
 import os
+import re
+import tempfile
 import time
 import json
 import csv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from io import StringIO
 
-def log_with_timestamp(message, is_start=False, is_end=False):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    prefix = "🟢 STARTING" if is_start else "🔴 COMPLETED" if is_end else "ℹ"
-    print(f"[{timestamp}] {prefix} {message}")
+try:
+    import orjson
+except ImportError:
+    # orjson is a fast drop-in; stdlib json keeps deployment trivial
+    orjson = None
 
-def extract_text_from_response(response):
-    log_with_timestamp("Extracting text from Textract response", is_start=True)
-    text_lines = [item['Text'] for item in response['Blocks'] if item['BlockType'] == 'LINE']
-    log_with_timestamp(f"Extracted {len(text_lines)} lines of text", is_end=True)
-    return text_lines
+try:
+    import tiktoken
+    _TOKEN_ENCODER = tiktoken.get_encoding('cl100k_base')
+except ImportError:
+    _TOKEN_ENCODER = None
 
-def wait_for_job_completion(textract, job_id):
-    log_with_timestamp(f"Waiting for Textract job {job_id} to complete", is_start=True)
-    while True:
-        response = textract.get_document_text_detection(JobId=job_id)
-        status = response['JobStatus']
-        log_with_timestamp(f"Current job status: {status}")
-        if status in ['SUCCEEDED', 'FAILED']:
-            break
-        time.sleep(5)
-    
-    if status == 'SUCCEEDED':
-        log_with_timestamp("Collecting results from successful Textract job", is_start=True)
-        raw_text = []
-        for item in response['Blocks']:
-            if item['BlockType'] == 'LINE':
-                raw_text.append(item['Text'])
-        
-        while 'NextToken' in response:
-            log_with_timestamp("Fetching next page of Textract results")
-            response = textract.get_document_text_detection(JobId=job_id, NextToken=response['NextToken'])
-            for item in response['Blocks']:
-                if item['BlockType'] == 'LINE':
-                    raw_text.append(item['Text'])
-        
-        log_with_timestamp(f"Collected {len(raw_text)} lines of text from Textract", is_end=True)
-        return raw_text
-    else:
-        error_msg = f"Textract job failed: {response.get('StatusMessage', 'No error message provided')}"
-        log_with_timestamp(f"ERROR: {error_msg}")
-        raise Exception(error_msg)
+# Bump whenever a prompt changes so stale cached responses are not reused
+PROMPT_VERSION = "v1"
 
-def chunk_text(text, max_chunk_size=6000):
-    """Split text into chunks while preserving context"""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_size = 0
-    
-    for word in words:
-        if current_size + len(word) + 1 > max_chunk_size and current_chunk:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_size = len(word)
-        else:
-            current_chunk.append(word)
-            current_size += len(word) + 1
-    
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
-    return chunks
-
-def process_with_bedrock_scraping(text_content):
-    log_with_timestamp("Preparing Bedrock API call", is_start=True)
-    
-    config = botocore.config.Config(
-        read_timeout=300,
-        connect_timeout=300,
-        retries={'max_attempts': 3}
-    )
-    
-    bedrock_runtime = boto3.client(
-        service_name='bedrock-runtime',
-        region_name='us-east-1',
-        config=config
-    )
-    
-    chunks = chunk_text(text_content)
-    all_results = []
-    
-    for i, chunk in enumerate(chunks):
-        log_with_timestamp(f"Processing chunk {i+1} of {len(chunks)}")
-        
-        prompt = """Analyze this medical report and provide the results in JSON format. Extract all test results and patient information.
+# Static prompt prefixes live at module level so the per-chunk loop only
+# builds the dynamic part. The prefix is sent as its own content block
+# ahead of the chunk, ready for prompt caching once the app moves to a
+# model that supports cache_control on Bedrock (Claude 3 Sonnet does not).
+_SCRAPE_PROMPT = """Analyze this medical report and provide the results in JSON format. Extract all test results and patient information.
 
 Required format:
-{   
-    
+{
+
     "test_groups": [
         {
             "group_name": "Test Group Name",
@@ -110,7 +51,7 @@ Required format:
                     "unit": "Unit of Measurement"
                 }
             ]
-            
+
         }
     ]
 }
@@ -126,92 +67,418 @@ Important:
 
 Parse this portion of the medical report:"""
 
-        try:
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 8000,
-                "temperature": 0.1,
-                "messages": [
+_ANALYSIS_PROMPT = """You are a medical assistant specialized in analyzing diagnostic health reports. I will give you the extracted text from a diagnostic report.
+
+            Your task is to:
+            1. Read and understand the results from tests such as blood work, imaging, and other diagnostics.
+            2. Summarize the findings in simple, non-technical language.
+            3. Identify and list:
+            - ✅ Pros: parameters that are within normal range or showing improvement.
+            - ❌ Cons: parameters that are outside the normal range or indicating a potential health concern.
+            4. Give suggestions for lifestyle improvements, further tests, or follow-ups if necessary — but DO NOT give any diagnosis.
+
+            Format your answer like this:
+
+            📋 Summary:
+            - [Brief, simple explanation of the overall health based on report]
+
+            ✅ Pros:
+            - [Positive finding 1]
+            - [Positive finding 2]
+
+            ❌ Cons:
+            - [Concern 1 with a short explanation]
+            - [Concern 2 with a short explanation]
+
+            📌 Suggestions:
+            - [Advice or follow-up if applicable]
+        """
+
+def _json_dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj)
+
+def _json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def log_with_timestamp(message, is_start=False, is_end=False):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    prefix = "🟢 STARTING" if is_start else "🔴 COMPLETED" if is_end else "ℹ"
+    print(f"[{timestamp}] {prefix} {message}")
+
+def extract_text_from_response(response):
+    log_with_timestamp("Extracting text from Textract response", is_start=True)
+    text_lines = [item['Text'] for item in response['Blocks'] if item['BlockType'] == 'LINE']
+    log_with_timestamp(f"Extracted {len(text_lines)} lines of text", is_end=True)
+    return text_lines
+
+# Below this page count the fork overhead outweighs the parallel win
+_PARALLEL_PDF_MIN_PAGES = 8
+
+def _pdf_page_text(args):
+    path, page_number = args
+    doc = fitz.open(path)
+    try:
+        return doc[page_number].get_text()
+    finally:
+        doc.close()
+
+def extract_pdf_text(pdf_bytes, min_chars_per_page=200):
+    """Return the text embedded in a digitally-generated PDF, or None when
+    the pages carry too little text (a scanned/image-only PDF) and OCR is
+    needed instead.
+
+    Pages are independent, so long documents are extracted across cores
+    with a ProcessPoolExecutor; short ones stay on the serial path."""
+    log_with_timestamp("Extracting embedded PDF text", is_start=True)
+    doc = fitz.open(stream=pdf_bytes, filetype='pdf')
+    try:
+        page_count = doc.page_count
+        if page_count < _PARALLEL_PDF_MIN_PAGES:
+            pages = [page.get_text() for page in doc]
+        else:
+            pages = None
+    finally:
+        doc.close()
+
+    if pages is None:
+        # Workers re-open the document from disk rather than pickling it
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as tmp:
+            tmp.write(pdf_bytes)
+            tmp.flush()
+            with ProcessPoolExecutor() as executor:
+                pages = list(executor.map(
+                    _pdf_page_text,
+                    [(tmp.name, i) for i in range(page_count)]
+                ))
+
+    if not pages or sum(len(p.strip()) for p in pages) < min_chars_per_page * len(pages):
+        log_with_timestamp("PDF looks scanned, falling back to OCR", is_end=True)
+        return None
+
+    log_with_timestamp(f"Extracted embedded text from {len(pages)} pages", is_end=True)
+    return '\n'.join(pages)
+
+def iter_textract_lines(textract, job_id):
+    """Yield LINE text page by page so only one copy of the document
+    is ever held in memory."""
+    log_with_timestamp("Collecting results from successful Textract job", is_start=True)
+    line_count = 0
+    next_token = None
+    while True:
+        # get_document_text_detection has no botocore paginator; page manually
+        response = textract.get_document_text_detection(
+            JobId=job_id, **({'NextToken': next_token} if next_token else {})
+        )
+        lines = extract_text_from_response(response)
+        line_count += len(lines)
+        yield from lines
+        next_token = response.get('NextToken')
+        if not next_token:
+            break
+    log_with_timestamp(f"Collected {line_count} lines of text from Textract", is_end=True)
+
+def wait_for_job_completion(textract, job_id):
+    log_with_timestamp(f"Waiting for Textract job {job_id} to complete", is_start=True)
+    delay = 1.0
+    while True:
+        response = textract.get_document_text_detection(JobId=job_id, MaxResults=1)
+        status = response['JobStatus']
+        log_with_timestamp(f"Current job status: {status}")
+        if status in ['SUCCEEDED', 'FAILED']:
+            break
+        time.sleep(delay)
+        delay = min(delay * 1.5, 10.0)
+
+    if status == 'SUCCEEDED':
+        return iter_textract_lines(textract, job_id)
+    else:
+        error_msg = f"Textract job failed: {response.get('StatusMessage', 'No error message provided')}"
+        log_with_timestamp(f"ERROR: {error_msg}")
+        raise Exception(error_msg)
+
+def _build_request_body(prompt, chunk):
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 8000,
+        "temperature": 0.1,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
                     {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"{prompt}\n\n{chunk}"
-                            }
-                        ]
+                        "type": "text",
+                        "text": prompt
+                    },
+                    {
+                        "type": "text",
+                        "text": chunk
                     }
                 ]
             }
-            
-            response = bedrock_runtime.invoke_model(
-                modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-                contentType='application/json',
-                accept='application/json',
-                body=json.dumps(request_body)
-            )
-            
-            result = json.loads(response['body'].read())
-            all_results.append(result)
-            
-        except Exception as e:
-            log_with_timestamp(f"Error processing chunk {i+1}: {str(e)}")
-            continue
-    
+        ]
+    }
+
+def _iter_stream_deltas(response):
+    """Yield text deltas from an invoke_model_with_response_stream response."""
+    for event in response['body']:
+        chunk = _json_loads(event['chunk']['bytes'])
+        if chunk.get('type') == 'content_block_delta':
+            yield chunk['delta'].get('text', '')
+
+@functools.lru_cache(maxsize=None)
+def get_client(service, region='us-east-1'):
+    """Shared boto3 client factory: one client per service/region for the
+    whole process, so Streamlit reruns stop re-paying credential-chain and
+    endpoint-resolution costs."""
+    return boto3.client(
+        service,
+        region_name=region,
+        config=botocore.config.Config(
+            retries={'max_attempts': 5, 'mode': 'adaptive'},
+            max_pool_connections=32
+        )
+    )
+
+@functools.lru_cache(maxsize=1)
+def _get_bedrock_client():
+    """One client per process: construction re-runs the credential chain
+    and endpoint resolution, which Streamlit would otherwise pay on every
+    rerun."""
+    config = botocore.config.Config(
+        read_timeout=300,
+        connect_timeout=300,
+        retries={'max_attempts': 3, 'mode': 'adaptive'},
+        max_pool_connections=32
+    )
+    return boto3.client(
+        service_name='bedrock-runtime',
+        region_name='us-east-1',
+        config=config
+    )
+
+def _cache_key(prompt, chunk):
+    return hashlib.sha256(f"{PROMPT_VERSION}|{prompt}|{chunk}".encode()).hexdigest()
+
+def _read_cached_result(cache_dir, key):
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path) as f:
+            result = json.load(f)
+        # Only trust entries that still look like a Bedrock response
+        if not result['content'][0]['text']:
+            raise ValueError("empty response text")
+        return result
+    except Exception as e:
+        log_with_timestamp(f"Evicting invalid cache entry {key}: {str(e)}")
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+
+def _write_cached_result(cache_dir, key, result):
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, f"{key}.json"), 'w') as f:
+        json.dump(result, f)
+
+def _token_count(text):
+    if _TOKEN_ENCODER is not None:
+        return len(_TOKEN_ENCODER.encode(text))
+    # Rough estimate when tiktoken is absent: ~4 characters per token
+    return max(1, len(text) // 4)
+
+def _pack_units(units, max_tokens, sep):
+    """Greedily pack (text, token_count) units into chunks of at most max_tokens."""
+    sep_tokens = _token_count(sep)
+    current = []
+    current_tokens = 0
+
+    for unit, unit_tokens in units:
+        if current and current_tokens + sep_tokens + unit_tokens > max_tokens:
+            yield sep.join(current)
+            current = []
+            current_tokens = 0
+        if current:
+            current_tokens += sep_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+
+    if current:
+        yield sep.join(current)
+
+def _iter_units(pieces, max_tokens):
+    """Yield (text, token_count) units from an iterable of text pieces."""
+    for piece in pieces:
+        for paragraph in re.split(r'\n\s*\n', piece):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = _token_count(paragraph)
+            if tokens <= max_tokens:
+                yield paragraph, tokens
+                continue
+            for line in paragraph.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                tokens = _token_count(line)
+                if tokens <= max_tokens:
+                    yield line, tokens
+                else:
+                    for word in line.split():
+                        yield word, _token_count(word)
+
+def chunk_text(text, max_tokens=6000):
+    """Split text into chunks while preserving context.
+
+    Whole paragraphs are packed greedily until the token budget is hit,
+    so chunk boundaries fall between tests instead of mid-sentence. A
+    paragraph that alone exceeds the budget is split on lines, and a
+    line that still exceeds it on words.
+
+    Accepts either a single string or an iterable of strings (such as the
+    Textract line generator) and yields chunks lazily, so the first chunk
+    is available before the whole document has been materialized."""
+    pieces = [text] if isinstance(text, str) else text
+    return _pack_units(_iter_units(pieces, max_tokens), max_tokens, '\n')
+
+def process_with_bedrock_scraping(text_content, cache_dir=None):
+    log_with_timestamp("Preparing Bedrock API call", is_start=True)
+
+    bedrock_runtime = _get_bedrock_client()
+
+    chunks = chunk_text(text_content)
+
+    prompt = _SCRAPE_PROMPT
+
+    def _call(chunk, i):
+        log_with_timestamp(f"Processing chunk {i+1}")
+        key = _cache_key(prompt, chunk) if cache_dir else None
+        if key:
+            cached = _read_cached_result(cache_dir, key)
+            if cached is not None:
+                log_with_timestamp(f"Cache hit for chunk {i+1}")
+                return cached
+        request_body = _build_request_body(prompt, chunk)
+
+        response = bedrock_runtime.invoke_model_with_response_stream(
+            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
+            contentType='application/json',
+            accept='application/json',
+            body=_json_dumps(request_body)
+        )
+        # Accumulating the stream costs the same total work as a blocking
+        # read but overlaps it with generation on the wire
+        result = {'content': [{'text': ''.join(_iter_stream_deltas(response))}]}
+        if key:
+            _write_cached_result(cache_dir, key, result)
+        return result
+
+    all_results = []
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        # Submitting while the generator is still producing lets the first
+        # Bedrock calls overlap with Textract pagination
+        futures = {executor.submit(_call, chunk, i): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            try:
+                all_results.append(future.result())
+            except Exception as e:
+                log_with_timestamp(f"Error processing chunk {futures[future]+1}: {str(e)}")
+                continue
+
     log_with_timestamp("Bedrock processing completed", is_end=True)
     return all_results
 
 
-def create_csv_from_results(all_results):
+# Matches the outermost {...} block when the model wraps its JSON in prose
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+def _parse_result_json(result):
+    """Pull the JSON block out of one Bedrock response, or return None.
+
+    Most responses are already clean JSON, so try json.loads directly and
+    only fall back to extracting the {...} block when that fails."""
+    response_text = result.get('content', [{}])[0].get('text', '')
+    try:
+        return _json_loads(response_text)
+    except ValueError:
+        match = _JSON_RE.search(response_text)
+        if match is None:
+            return None
+        return _json_loads(match.group(0))
+
+
+def iter_csv_rows(all_results, first_group_info=None):
+    """Yield CSV rows one at a time so callers can stream them instead of
+    buffering the whole file in memory.
+
+    When first_group_info is a dict, the name and date from the first
+    parsed group are recorded in it, so callers needing those fields do
+    not have to parse every response a second time."""
     log_with_timestamp("Creating CSV from results", is_start=True)
-    output = StringIO()
-    writer = csv.writer(output)
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    def _emit(row):
+        writer.writerow(row)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
 
-    # Write the header row for the CSV
-    writer.writerow(["Test_Group","Patient_Name","age","Date_of_test","Test_Name", "Result", "Reference_Range", "Unit" ])
+    # Header row for the CSV
+    yield _emit(["Test_Group","Patient_Name","age","Date_of_test","Test_Name", "Result", "Reference_Range", "Unit" ])
 
     for result in all_results:
         try:
-            # Validate and parse the response
-            response_text = result.get('content', [{}])[0].get('text', '')
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-
-            if json_start >= 0 and json_end > json_start:
-                # Parse JSON data from the response
-                parsed_data = json.loads(response_text[json_start:json_end])
-
-                for group in parsed_data.get('test_groups', []):
-                    group_name = group.get('group_name', '')
-
-                    patient_name = group.get('name', '')
-                    test_date = group.get('date', '')
-                    age = group.get('age', '')
-
-                    
-
-                    for test in group.get('tests', []):
-                        # Write each test result as a row in the CSV
-                        writer.writerow([
-                            group_name,
-                            patient_name,
-                            age,
-                            test_date,
-                            test.get('test_name', ''),
-                            test.get('result', ''),
-                            test.get('reference_range', ''),
-                            test.get('unit', '')
-                            
-                        ])
-
-            log_with_timestamp(f"Successfully processed result of {patient_name}.", is_start=True)
+            parsed_data = _parse_result_json(result)
+            if parsed_data is None:
+                continue
+
+            for group in parsed_data.get('test_groups', []):
+                group_name = group.get('group_name', '')
+
+                patient_name = group.get('name', '')
+                test_date = group.get('date', '')
+                age = group.get('age', '')
+
+                if first_group_info is not None and 'name' not in first_group_info:
+                    first_group_info['name'] = patient_name
+                    first_group_info['date'] = test_date
+
+                log_with_timestamp(f"Successfully processed result of {patient_name}.", is_start=True)
+
+                for test in group.get('tests', []):
+                    # Write each test result as a row in the CSV
+                    yield _emit([
+                        group_name,
+                        patient_name,
+                        age,
+                        test_date,
+                        test.get('test_name', ''),
+                        test.get('result', ''),
+                        test.get('reference_range', ''),
+                        test.get('unit', '')
+                    ])
+
         except Exception as e:
             # Log errors with detailed information
             log_with_timestamp(f"Error processing result: {str(e)}")
             continue
 
     log_with_timestamp("CSV creation completed", is_end=True)
-    return output.getvalue(),patient_name,test_date
+
+
+def create_csv_from_results(all_results):
+    first_group_info = {}
+    csv_content = ''.join(iter_csv_rows(all_results, first_group_info))
+    return csv_content, first_group_info.get('name', ''), first_group_info.get('date', '')
 
 
 # def lambda_handler(event, context):
@@ -310,85 +577,91 @@ def create_csv_from_results(all_results):
 #     })
 # }
     
-def process_with_bedrock_Analysis(text_content):
+def process_with_bedrock_Analysis(text_content, cache_dir=None):
     log_with_timestamp("Preparing Bedrock API call", is_start=True)
-    
-    config = botocore.config.Config(
-        read_timeout=300,
-        connect_timeout=300,
-        retries={'max_attempts': 3}
-    )
-    
-    bedrock_runtime = boto3.client(
-        service_name='bedrock-runtime',
-        region_name='us-east-1',
-        config=config
-    )
-    
+
+    bedrock_runtime = _get_bedrock_client()
+
     chunks = chunk_text(text_content)
-    all_results = []
-    
-    for i, chunk in enumerate(chunks):
-        log_with_timestamp(f"Processing chunk {i+1} of {len(chunks)}")
-        
-        prompt = """You are a medical assistant specialized in analyzing diagnostic health reports. I will give you the extracted text from a diagnostic report. 
 
-            Your task is to:
-            1. Read and understand the results from tests such as blood work, imaging, and other diagnostics.
-            2. Summarize the findings in simple, non-technical language.
-            3. Identify and list:
-            - ✅ Pros: parameters that are within normal range or showing improvement.
-            - ❌ Cons: parameters that are outside the normal range or indicating a potential health concern.
-            4. Give suggestions for lifestyle improvements, further tests, or follow-ups if necessary — but DO NOT give any diagnosis.
+    prompt = _ANALYSIS_PROMPT
+
+    def _call(chunk, i):
+        log_with_timestamp(f"Processing chunk {i+1}")
+        key = _cache_key(prompt, chunk) if cache_dir else None
+        if key:
+            cached = _read_cached_result(cache_dir, key)
+            if cached is not None:
+                log_with_timestamp(f"Cache hit for chunk {i+1}")
+                return cached
+        request_body = _build_request_body(prompt, chunk)
+
+        response = bedrock_runtime.invoke_model_with_response_stream(
+            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
+            contentType='application/json',
+            accept='application/json',
+            body=_json_dumps(request_body)
+        )
+        # Accumulating the stream costs the same total work as a blocking
+        # read but overlaps it with generation on the wire
+        result = {'content': [{'text': ''.join(_iter_stream_deltas(response))}]}
+        if key:
+            _write_cached_result(cache_dir, key, result)
+        return result
 
-            Format your answer like this:
+    all_results = []
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        # Submitting while the generator is still producing lets the first
+        # Bedrock calls overlap with Textract pagination
+        futures = {executor.submit(_call, chunk, i): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            try:
+                all_results.append(future.result())
+            except Exception as e:
+                log_with_timestamp(f"Error processing chunk {futures[future]+1}: {str(e)}")
+                continue
 
-            📋 Summary:
-            - [Brief, simple explanation of the overall health based on report]
+    log_with_timestamp("Bedrock processing completed")
+    return all_results
 
-            ✅ Pros:
-            - [Positive finding 1]
-            - [Positive finding 2]
+def iter_analysis_stream(text_content, cache_dir=None):
+    """Yield analysis text as Bedrock generates it so the UI can render
+    tokens progressively (st.write_stream). Chunks are processed in order
+    and share the on-disk cache used by process_with_bedrock_Analysis."""
+    log_with_timestamp("Preparing Bedrock API call", is_start=True)
 
-            ❌ Cons:
-            - [Concern 1 with a short explanation]
-            - [Concern 2 with a short explanation]
+    bedrock_runtime = _get_bedrock_client()
+    prompt = _ANALYSIS_PROMPT
 
-            📌 Suggestions:
-            - [Advice or follow-up if applicable]
-        """
+    for i, chunk in enumerate(chunk_text(text_content)):
+        log_with_timestamp(f"Processing chunk {i+1}")
+        if i:
+            yield '\n\n'
+
+        key = _cache_key(prompt, chunk) if cache_dir else None
+        if key:
+            cached = _read_cached_result(cache_dir, key)
+            if cached is not None:
+                log_with_timestamp(f"Cache hit for chunk {i+1}")
+                yield cached['content'][0]['text']
+                continue
 
         try:
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 8000,
-                "temperature": 0.1,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"{prompt}\n\n{chunk}"
-                            }
-                        ]
-                    }
-                ]
-            }
-            
-            response = bedrock_runtime.invoke_model(
+            response = bedrock_runtime.invoke_model_with_response_stream(
                 modelId='anthropic.claude-3-sonnet-20240229-v1:0',
                 contentType='application/json',
                 accept='application/json',
-                body=json.dumps(request_body)
+                body=_json_dumps(_build_request_body(prompt, chunk))
             )
-            print(response)
-            result = json.loads(response['body'].read())
-            all_results.append(result)
-            
+            pieces = []
+            for delta in _iter_stream_deltas(response):
+                pieces.append(delta)
+                yield delta
         except Exception as e:
             log_with_timestamp(f"Error processing chunk {i+1}: {str(e)}")
             continue
-    
+
+        if key:
+            _write_cached_result(cache_dir, key, {'content': [{'text': ''.join(pieces)}]})
+
     log_with_timestamp("Bedrock processing completed")
-    return all_results
\ No newline at end of file
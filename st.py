@@ -1,34 +1,32 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-import boto3
 import json
+from boto3.s3.transfer import TransferConfig
 
-# Load environment variables from .env
+# Load environment variables from .env so boto3's credential chain
+# picks up AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY / AWS_DEFAULT_REGION
 load_dotenv()
 
-# Access credentials from environment
-aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
-aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-region = os.getenv("AWS_DEFAULT_REGION")
-
-# Connect to AWS service (e.g., S3)
-s3 = boto3.client(
-    's3',
-    aws_access_key_id=aws_access_key,
-    aws_secret_access_key=aws_secret_key,
-    region_name=region
-)
-
-
-
-from amazon import (log_with_timestamp,
+from amazon import (get_client,
+                    log_with_timestamp,
+                    extract_pdf_text,
                     extract_text_from_response,
                     wait_for_job_completion,
                     chunk_text,
                     create_csv_from_results,
-                    process_with_bedrock_Analysis)
+                    iter_analysis_stream)
+
 
+# Re-submitted reports hit this cache instead of calling Bedrock again
+BEDROCK_CACHE_DIR = "/tmp/bedrock_cache"
+
+# Upload large scans as parallel multipart chunks instead of one PUT
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+)
 
 # # Streamlit UI
 st.set_page_config(page_title="LLM Diagnostic Analyzer")
@@ -39,8 +37,9 @@ uploaded_file = st.file_uploader("Upload Diagnostic PDF", type=["pdf"])
 if uploaded_file:
     with st.spinner("📄 Reading PDF..."):
         # extracting text from the uploaded PDF using textract
-        s3 = boto3.client('s3')
-        textract = boto3.client('textract', region_name='us-east-1')
+        # Cached per service in amazon.get_client, reused across reruns
+        s3 = get_client('s3')
+        textract = get_client('textract')
 
         file_name, file_extension = os.path.splitext(os.path.basename(uploaded_file.name))
         print(f"File Name: {file_name}, File Extension: {file_extension}")
@@ -52,22 +51,28 @@ if uploaded_file:
                 textract_response = textract.detect_document_text(Document={'Bytes': file_content})
                 raw_text = extract_text_from_response(textract_response)
             elif file_extension.lower() == '.pdf':
-                # Reset file pointer and upload to S3
-                uploaded_file.seek(0)
-                s3_bucket = "processeddocsb2"  # <-- Replace with your S3 bucket name
-                s3_key = file_name + file_extension
-                s3.upload_fileobj(uploaded_file, s3_bucket, s3_key)
+                # Digitally-generated PDFs already carry their text; only
+                # scanned ones need the S3 upload + Textract OCR round trip
+                pdf_text = extract_pdf_text(uploaded_file.read())
+                if pdf_text is not None:
+                    raw_text = [pdf_text]
+                else:
+                    # Reset file pointer and upload to S3
+                    uploaded_file.seek(0)
+                    s3_bucket = "processeddocsb2"  # <-- Replace with your S3 bucket name
+                    s3_key = file_name + file_extension
+                    s3.upload_fileobj(uploaded_file, s3_bucket, s3_key, Config=S3_TRANSFER_CONFIG)
 
-                textract_response = textract.start_document_text_detection(
-                    DocumentLocation={
-                        'S3Object': {
-                            'Bucket': s3_bucket,
-                            'Name': s3_key
+                    textract_response = textract.start_document_text_detection(
+                        DocumentLocation={
+                            'S3Object': {
+                                'Bucket': s3_bucket,
+                                'Name': s3_key
+                            }
                         }
-                    }
-                )
-                job_id = textract_response['JobId']
-                raw_text = wait_for_job_completion(textract, job_id)
+                    )
+                    job_id = textract_response['JobId']
+                    raw_text = wait_for_job_completion(textract, job_id)
             else:
                 raise ValueError(f"Unsupported file type: {file_extension}")
         except Exception as e:
@@ -75,30 +80,15 @@ if uploaded_file:
             raw_text = ""
 
     if raw_text:
-        text_content = ''.join(raw_text)  # Chunk text for processing
-        with st.spinner("🧠 Analyzing with LLM..."):
-            bedrock_results = process_with_bedrock_Analysis(text_content)
         st.subheader("✅ Analysis Report")
-        # Only display the parsed/decoded result, not the full response object
-
-    # ...existing code...
-    if isinstance(bedrock_results, dict):
-        # Try to get 'text' from the first result
-        text_content = (
-            bedrock_results.get("results", [{}])[0].get("text")
-            or bedrock_results.get("results", [{}])[0].get("content")[0].get("text")
-            or "No content found."
-        )
-        st.markdown(text_content)
-    elif isinstance(bedrock_results, list) and len(bedrock_results) > 0:
-        # If it's a list, try to get 'text' or 'content' from the first item
-        text_content = (
-            bedrock_results[0].get("text")
-            or bedrock_results[0].get("content")[0].get("text")
-            or "No content found."
-        )
-        st.markdown(text_content)
-    else:
-        st.markdown(str(bedrock_results))
+        with st.spinner("🧠 Analyzing with LLM..."):
+            # raw_text may be a list or the lazy Textract line generator;
+            # tokens render as Bedrock generates them instead of after the
+            # full response has been read. Because the generator is only
+            # consumed here, Textract pagination failures surface here too.
+            try:
+                st.write_stream(iter_analysis_stream(raw_text, cache_dir=BEDROCK_CACHE_DIR))
+            except Exception as e:
+                st.error(f"Error analyzing report: {e}")
 else:
     st.info("Upload a diagnostic report PDF to begin.")
\ No newline at end of file